@@ -2,23 +2,28 @@ import os
 import re
 from datetime import datetime, time, timezone
 from io import BytesIO
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
-import pandas as pd
 import streamlit as st
-from streamlit_option_menu import option_menu
-
-from core.crud import (add_turma, bootstrap_initial_user, check_password,
-                       create_user, delete_enrollment, delete_turma,
-                       delete_user, find_user_by_username,
-                       get_all_enrollments_by_semester, get_all_turmas,
-                       get_all_users, get_configuracoes, get_unique_semesters,
-                       update_configuracoes, update_turma, update_user,
-                       get_unique_enrollment_semesters,
-                       get_deleted_enrollments_by_semester, recover_enrollment)
+from bson import ObjectId
+
+from core.auth import authenticate
+from core.crud import (add_turma, bootstrap_initial_user, create_user,
+                       delete_enrollment, delete_enrollments, delete_turma,
+                       delete_user, get_all_enrollments_by_semester,
+                       get_deleted_enrollments_by_semester, get_users_page,
+                       recover_enrollment,
+                       update_configuracoes, update_turma, update_user)
 from core.database import get_database, get_db_connection
+from core.repository import Repository
 from utils.style import display_logo, load_css
 
+# pandas, openpyxl e pyarrow só são importados pelas páginas que os usam,
+# para que a tela de login carregue sem eles.
+if TYPE_CHECKING:
+    import pandas as pd
+
 try:
     LOCAL_TZ = ZoneInfo('America/Recife')
 except Exception:
@@ -31,7 +36,9 @@ def is_valid_semester_format(semester: str) -> bool:
     return re.fullmatch(r'\d{4}\.[0-9]', semester) is not None
 
 
-def to_excel(df: pd.DataFrame):
+def to_excel(df: 'pd.DataFrame'):
+    import pandas as pd
+
     output = BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Inscricoes')
@@ -64,20 +71,90 @@ def login_form(db):
                 )
 
                 if submitted:
-                    user = find_user_by_username(db, username)
-                    if user and check_password(
-                        password, user['hashed_password']
-                    ):
-                        st.session_state.logged_in = True
-                        st.session_state.username = user['username']
-                        st.session_state.role = user['role']
-                        st.rerun()
+                    try:
+                        user = authenticate(db, username, password)
+                    except ValueError as e:
+                        st.error(str(e))
                     else:
-                        st.error('Usuário ou senha incorretos.')
+                        if user:
+                            st.session_state.logged_in = True
+                            st.session_state.username = user['username']
+                            st.session_state.role = user['role']
+                            st.rerun()
+                        else:
+                            st.error('Usuário ou senha incorretos.')
     return False
 
 
-def display_user_management(db):
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_users_page(_repo, admin_dev, search, page, page_size):
+    """Página do diretório de usuários; invalidada a cada escrita em usuários."""
+    # Só executa (e conta as consultas count + find) quando não há cache.
+    _repo.count_query('get_users_page', 2)
+    return get_users_page(_repo.db, admin_dev, search, page, page_size)
+
+
+@st.cache_resource
+def get_frame_cache():
+    """Cache de DataFrames de inscrições compartilhado entre as sessões do processo."""
+    from core.frame_cache import FrameCache
+
+    return FrameCache()
+
+
+def _session_alive_checker():
+    """Retorna uma função que indica se a sessão atual ainda está ativa."""
+    try:
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        runtime = get_instance()
+        session_id = get_script_run_ctx().session_id
+        return lambda: runtime.is_active_session(session_id)
+    except Exception:
+        return lambda: True
+
+
+def cancel_prefetch():
+    cancel = st.session_state.pop('prefetch_cancel', None)
+    if cancel:
+        cancel.set()
+
+
+def schedule_enrollment_prefetch(repo, config):
+    """
+    Após a renderização da página de inscrições, aquece em segundo plano o
+    semestre ativo, o semestre anterior ao selecionado e as excluídas do atual.
+    """
+    from core.frame_cache import schedule_prefetch
+
+    cancel_prefetch()
+    active_semester = config.get('activeSemester', 'N/A')
+    selected = st.session_state.get('enrollment_semester', active_semester)
+    semesters = sorted(
+        set(repo.get_unique_enrollment_semesters()) | {active_semester},
+        reverse=True,
+    )
+
+    targets = [(active_semester, False)]
+    if selected in semesters:
+        position = semesters.index(selected)
+        if position + 1 < len(semesters):
+            targets.append((semesters[position + 1], False))
+    if st.session_state.get('role') in ['admin-dev', 'admin']:
+        targets.append((selected, True))
+
+    st.session_state.prefetch_cancel = schedule_prefetch(
+        repo.db,
+        get_frame_cache(),
+        targets,
+        active_semester,
+        is_alive=_session_alive_checker(),
+    )
+
+
+def display_user_management(repo):
+    db = repo.db
     st.title('👥 Gerenciamento de Usuários')
     user_role = st.session_state.get('role')
     if user_role not in ['admin-dev', 'admin']:
@@ -101,22 +178,39 @@ def display_user_management(db):
             if st.form_submit_button('Adicionar Usuário'):
                 if password != confirm_password:
                     st.error('As senhas não coincidem.')
-                elif find_user_by_username(db, username):
-                    st.error('Este nome de usuário já existe.')
                 else:
-                    create_user(
-                        db,
-                        {
-                            'username': username,
-                            'password': password,
-                            'role': role,
-                        },
-                    )
-                    st.success(f"Usuário '{username}' criado com sucesso!")
-                    st.rerun()
+                    try:
+                        create_user(
+                            db,
+                            {
+                                'username': username,
+                                'password': password,
+                                'role': role,
+                            },
+                            actor=st.session_state.get('username'),
+                        )
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        cached_users_page.clear()
+                        st.success(f"Usuário '{username}' criado com sucesso!")
+                        st.rerun()
 
     st.subheader('Usuários Cadastrados')
-    users = get_all_users(db, admin_dev=(user_role == 'admin-dev'))
+    page_size = 20
+    search = st.text_input(
+        'Pesquisar usuário', placeholder='Digite o início do nome...'
+    )
+    if st.session_state.get('users_search') != search:
+        st.session_state.users_search = search
+        st.session_state.users_page = 0
+    page = st.session_state.get('users_page', 0)
+
+    users, total = cached_users_page(
+        repo, user_role == 'admin-dev', search, page, page_size
+    )
+    if not users:
+        st.info('Nenhum usuário encontrado.')
 
     for user in users:
         st.markdown('---')
@@ -131,7 +225,10 @@ def display_user_management(db):
         if cols[3].button(
             '🗑️', key=f"delete_{user['_id']}", help='Deletar Usuário'
         ):
-            delete_user(db, user['_id'])
+            delete_user(
+                db, user['_id'], actor=st.session_state.get('username')
+            )
+            cached_users_page.clear()
             st.rerun()
 
         if st.session_state.get('edit_user_id') == user['_id']:
@@ -168,7 +265,13 @@ def display_user_management(db):
                             }
                             if new_password:
                                 update_data['password'] = new_password
-                            update_user(db, user['_id'], update_data)
+                            update_user(
+                                db,
+                                user['_id'],
+                                update_data,
+                                actor=st.session_state.get('username'),
+                            )
+                            cached_users_page.clear()
                             del st.session_state.edit_user_id
                             st.rerun()
                         except ValueError as e:
@@ -177,11 +280,37 @@ def display_user_management(db):
                     del st.session_state.edit_user_id
                     st.rerun()
 
+    total_pages = max(1, -(-total // page_size))
+    if total_pages > 1:
+        st.markdown('---')
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        if col_prev.button(
+            '⬅️ Anterior', key='users_prev', disabled=page == 0, width='stretch'
+        ):
+            st.session_state.users_page = page - 1
+            st.rerun()
+        col_info.markdown(
+            f"<p style='text-align: center;'>Página {page + 1} de {total_pages} ({total} usuários)</p>",
+            unsafe_allow_html=True,
+        )
+        if col_next.button(
+            'Próxima ➡️',
+            key='users_next',
+            disabled=page + 1 >= total_pages,
+            width='stretch',
+        ):
+            st.session_state.users_page = page + 1
+            st.rerun()
+
 
-def display_enrollment_management(db, config):
+def display_enrollment_management(repo, config):
+    from core.frames import (build_export_frame, frame_memory_usage,
+                             search_mask)
+
+    db = repo.db
     st.title('🧑‍🎓 Gerenciamento de Inscrições')
     active_semester = config.get('activeSemester', 'N/A')
-    available_semesters = get_unique_enrollment_semesters(db)
+    available_semesters = repo.get_unique_enrollment_semesters()
 
     if active_semester not in available_semesters:
         available_semesters.append(active_semester)
@@ -203,6 +332,7 @@ def display_enrollment_management(db, config):
             'Selecione o Semestre:',
             available_semesters,
             index=default_index,
+            key='enrollment_semester',
         )
 
     status_view = 'Ativas'
@@ -212,60 +342,34 @@ def display_enrollment_management(db, config):
                 'Exibir:',
                 ['Ativas', 'Excluídas'],
                 horizontal=True,
+                key='enrollment_status',
             )
 
     st.markdown(f'Visualizando inscrições **{status_view}** de **{selected_semester}**.')
 
-    if status_view == 'Ativas':
-        enrollments = get_all_enrollments_by_semester(db, selected_semester)
-    else:
-        enrollments = get_deleted_enrollments_by_semester(db, selected_semester)
+    try:
+        df = repo.get_enrollment_frame(
+            get_frame_cache(),
+            selected_semester,
+            deleted=(status_view != 'Ativas'),
+            active_semester=active_semester,
+        )
+    except Exception as e:
+        st.error(f'Erro ao carregar as inscrições de {selected_semester}: {e}')
+        return
 
-    if not enrollments:
+    if df.empty:
         st.warning('Nenhuma inscrição encontrada.')
         return
 
-    df = pd.DataFrame(enrollments)
-    df['nota_classificacao'] = df.get(
-        'notas_relevantes', pd.Series(dtype='object')
-    ).apply(lambda x: x.get('nota_predita', 0) if isinstance(x, dict) else 0)
-
-    try:
-        if (
-            'data_inscricao' in df.columns
-            and 'data_ultima_atualizacao' in df.columns
-        ):
-            colunas_data = ['data_inscricao', 'data_ultima_atualizacao']
-            timezone_alvo = 'America/Recife'
-
-            for col in colunas_data:
-                df[col] = pd.to_datetime(df[col], format='ISO8601')
-                if df[col].dt.tz is None:
-                    df[col] = (
-                        df[col]
-                        .dt.tz_localize('UTC')
-                        .dt.tz_convert(timezone_alvo)
-                    )
-                else:
-                    df[col] = df[col].dt.tz_convert(timezone_alvo)
-                df[col] = df[col].dt.floor('s')
-                df[col] = df[col].dt.strftime('%d/%m/%Y %H:%M:%S')
-    except Exception as e:
-        st.error(
-            f'Erro ao converter datas de inscrição: {e}. Verifique o formato dos dados no banco.'
-        )
-
     st.subheader('Pesquisar e Filtrar')
     search_query = st.text_input(
         'Pesquisar por Nome, Matrícula, etc.',
         placeholder='Digite aqui para buscar...',
     )
-    filtered_df = df.copy()
+    filtered_df = df
     if search_query:
-        search_query = search_query.lower()
-        filtered_df = df[
-            df.apply(lambda row: search_query in str(row).lower(), axis=1)
-        ]
+        filtered_df = df[search_mask(df, search_query)]
 
     display_columns = [
         'Nome',
@@ -277,21 +381,46 @@ def display_enrollment_management(db, config):
         'nota_classificacao',
         'data_inscricao',
     ]
-    # Exibir apenas colunas que existem no DataFrame
-    display_columns = [c for c in display_columns if c in filtered_df.columns]
 
     st.dataframe(
-        filtered_df[display_columns], width='stretch', hide_index=True
+        filtered_df[display_columns],
+        width='stretch',
+        hide_index=True,
+        column_config={
+            'data_inscricao': st.column_config.DatetimeColumn(
+                format='DD/MM/YYYY HH:mm:ss'
+            ),
+            'nota_classificacao': st.column_config.NumberColumn(
+                format='%.2f'
+            ),
+        },
     )
     st.info(f'Exibindo **{len(filtered_df)}** de **{len(df)}** inscrições.')
-    excel_data = to_excel(filtered_df)
-    st.download_button(
-        '📥 Exportar para Excel',
-        excel_data,
-        f'inscricoes_{selected_semester}.xlsx',
-        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        width='stretch',
+    st.caption(
+        f'Memória do DataFrame: {frame_memory_usage(df) / 1024 ** 2:.2f} MB'
     )
+    # A exportação usa os documentos completos (não só as colunas do painel),
+    # por isso só é montada sob demanda.
+    if st.button('📥 Preparar exportação para Excel', width='stretch'):
+        enrollments = (
+            get_all_enrollments_by_semester(db, selected_semester)
+            if status_view == 'Ativas'
+            else get_deleted_enrollments_by_semester(db, selected_semester)
+        )
+        export_df = build_export_frame(enrollments)
+        if search_query and not export_df.empty:
+            export_df = export_df[export_df['_id'].isin(filtered_df['_id'])]
+        st.download_button(
+            '📥 Exportar para Excel',
+            to_excel(export_df),
+            f'inscricoes_{selected_semester}.xlsx',
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            width='stretch',
+        )
+
+    if can_delete and status_view == 'Ativas':
+        if st.toggle('🔁 Detectar inscrições duplicadas'):
+            display_duplicate_enrollments(db, df, selected_semester)
 
     if can_delete:
         expander_label = (
@@ -315,7 +444,7 @@ def display_enrollment_management(db, config):
             for enrollment in filtered_enrollments_list:
                 st.markdown('---')
                 cols = st.columns(col_widths)
-                enrollment_id = enrollment['_id']
+                enrollment_id = ObjectId(enrollment['_id'])
 
                 cols[0].write(enrollment.get('Nome', 'N/A'))
                 cols[1].write(enrollment.get('Matricula', 'N/A'))
@@ -328,7 +457,11 @@ def display_enrollment_management(db, config):
                         key=f'del_{enrollment_id}',
                         help=f"Mover {enrollment.get('Nome')} para a lixeira",
                     ):
-                        delete_enrollment(db, enrollment_id)
+                        delete_enrollment(
+                            db,
+                            enrollment_id,
+                            actor=st.session_state.get('username'),
+                        )
                         st.toast(f"Enviado para lixeira: {enrollment.get('Nome')}")
                         st.rerun()
                 else:
@@ -337,12 +470,84 @@ def display_enrollment_management(db, config):
                         key=f'rec_{enrollment_id}',
                         help=f"Restaurar inscrição de {enrollment.get('Nome')}",
                     ):
-                        recover_enrollment(db, enrollment_id)
+                        recover_enrollment(
+                            db,
+                            enrollment_id,
+                            actor=st.session_state.get('username'),
+                        )
                         st.success(f"Inscrição de {enrollment.get('Nome')} recuperada com sucesso!")
                         st.rerun()
 
 
-def display_turma_management(db, config):
+def display_duplicate_enrollments(db, df, semester):
+    from core.frames import find_duplicate_enrollments
+    from core.snapshots import fetch_enrollment_frame
+
+    duplicates = find_duplicate_enrollments(df)
+    if duplicates.empty:
+        st.success('Nenhuma inscrição duplicada encontrada.')
+        return
+
+    to_delete = list(duplicates.loc[~duplicates['manter'], '_id'])
+    st.warning(
+        f"**{duplicates['grupo'].nunique()}** grupos com a mesma Matrícula ou "
+        f'email ({len(duplicates)} inscrições). A inscrição mais recente de '
+        'cada grupo é mantida.'
+    )
+    st.dataframe(
+        duplicates[
+            [
+                'grupo',
+                'manter',
+                'Nome',
+                'Matricula',
+                'email',
+                'turma_escolhida',
+                'data_ultima_atualizacao',
+            ]
+        ],
+        width='stretch',
+        hide_index=True,
+        column_config={
+            'data_ultima_atualizacao': st.column_config.DatetimeColumn(
+                format='DD/MM/YYYY HH:mm:ss'
+            ),
+        },
+    )
+    confirmed = st.checkbox(
+        f'Revisei os grupos acima e confirmo a exclusão de {len(to_delete)} '
+        'inscrições.',
+        key=f'confirm_duplicates_{semester}',
+    )
+    if st.button(
+        f'🗑️ Excluir {len(to_delete)} duplicadas (manter a mais recente)',
+        type='primary',
+        width='stretch',
+        disabled=not confirmed,
+    ):
+        del st.session_state[f'confirm_duplicates_{semester}']
+        # O DataFrame do cache pode estar defasado (ACTIVE_FRAME_TTL): os grupos
+        # são recalculados direto do banco e só é excluído o que segue duplicado.
+        fresh = find_duplicate_enrollments(fetch_enrollment_frame(db, semester))
+        still_duplicated = set(fresh.loc[~fresh['manter'], '_id'])
+        confirmed_ids = [
+            ObjectId(i) for i in to_delete if i in still_duplicated
+        ]
+        deleted = delete_enrollments(
+            db, semester, confirmed_ids, actor=st.session_state.get('username')
+        )
+        st.toast(f'{deleted} inscrições duplicadas enviadas para a lixeira.')
+        skipped = len(to_delete) - len(confirmed_ids)
+        if skipped:
+            st.toast(
+                f'{skipped} inscrições mudaram desde a última leitura e não '
+                'foram excluídas. Revise os grupos novamente.'
+            )
+        st.rerun()
+
+
+def display_turma_management(repo, config):
+    db = repo.db
     st.title('📚 Gerenciamento de Turmas')
     user_role = st.session_state.get('role', 'auxiliar')
     with st.expander('➕ Adicionar Nova Turma'):
@@ -362,6 +567,7 @@ def display_turma_management(db, config):
                             'semester': semester,
                             'is_active': is_active,
                         },
+                        actor=st.session_state.get('username'),
                     )
                     st.success(f"Turma '{name}' adicionada!")
                     st.rerun()
@@ -370,7 +576,7 @@ def display_turma_management(db, config):
                         'Formato de semestre inválido(Ex: 2023.1) ou nome vazio.'
                     )
     st.subheader('Filtros e Visualização')
-    all_semesters = sorted(get_unique_semesters(db), reverse=True)
+    all_semesters = sorted(repo.get_unique_semesters(), reverse=True)
     active_semester = config.get('activeSemester')
     try:
         default_index = all_semesters.index(active_semester)
@@ -383,7 +589,7 @@ def display_turma_management(db, config):
     status_filter = col2.radio(
         'Filtrar por Status', ['Ativas', 'Inativas', 'Todas'], horizontal=True
     )
-    turmas = get_all_turmas(db)
+    turmas = repo.get_all_turmas()
     filtered_turmas = [
         t for t in turmas if t.get('semester') == selected_semester
     ]
@@ -415,7 +621,9 @@ def display_turma_management(db, config):
             if cols[3].button(
                 '🗑️', key=f"delete_{turma['_id']}", help='Deletar Turma'
             ):
-                delete_turma(db, turma['_id'])
+                delete_turma(
+                    db, turma['_id'], actor=st.session_state.get('username')
+                )
                 st.rerun()
         if st.session_state.get('edit_turma_id') == turma['_id']:
             with st.form(f"edit_form_{turma['_id']}"):
@@ -437,6 +645,7 @@ def display_turma_management(db, config):
                                 'semester': new_semester,
                                 'is_active': new_is_active,
                             },
+                            actor=st.session_state.get('username'),
                         )
                         del st.session_state.edit_turma_id
                         st.rerun()
@@ -448,6 +657,8 @@ def display_turma_management(db, config):
 
 
 def display_settings_management(db, config):
+    import pandas as pd
+
     st.title('⚙️ Configurações do Sistema')
     user_role = st.session_state.get('role')
     if user_role not in ['admin-dev', 'admin']:
@@ -520,7 +731,9 @@ def display_settings_management(db, config):
                 'enrollmentEndDate': end_date_utc_iso,
                 'cutoffScore': cutoff_score,
             }
-            if update_configuracoes(db, new_config):
+            if update_configuracoes(
+                db, new_config, actor=st.session_state.get('username')
+            ):
                 st.success('Salvo!')
                 st.rerun()
             else:
@@ -529,6 +742,64 @@ def display_settings_management(db, config):
             st.error('Formato de Semestre inválido!')
 
 
+def display_audit_log(repo):
+    import pandas as pd
+
+    st.title('📜 Registro de Auditoria')
+    user_role = st.session_state.get('role')
+    if user_role not in ['admin-dev', 'admin']:
+        st.error('🚫 Acesso Negado.')
+        return
+
+    page_size = 50
+    col_action, col_actor = st.columns(2)
+    action = col_action.selectbox(
+        'Ação', ['Todas'] + repo.get_audit_actions()
+    )
+    actor = col_actor.text_input('Usuário', placeholder='Filtrar por usuário')
+
+    filters = (action, actor)
+    if st.session_state.get('audit_filters') != filters:
+        st.session_state.audit_filters = filters
+        st.session_state.audit_page = 0
+    page = st.session_state.get('audit_page', 0)
+
+    events, total = repo.get_audit_page(
+        page=page,
+        page_size=page_size,
+        action=None if action == 'Todas' else action,
+        actor=actor.strip().lower() or None,
+    )
+    if not events:
+        st.info('Nenhum evento registrado.')
+        return
+
+    df = pd.DataFrame(events)
+    df['timestamp'] = (
+        pd.to_datetime(df['timestamp'], utc=True)
+        .dt.tz_convert(LOCAL_TZ)
+        .dt.strftime('%d/%m/%Y %H:%M:%S')
+    )
+    df['target_id'] = df['target_id'].astype(str)
+    df['details'] = df['details'].astype(str)
+    st.dataframe(df, width='stretch', hide_index=True)
+
+    total_pages = max(1, -(-total // page_size))
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button('⬅️ Anterior', disabled=page == 0, width='stretch'):
+        st.session_state.audit_page = page - 1
+        st.rerun()
+    col_info.markdown(
+        f"<p style='text-align: center;'>Página {page + 1} de {total_pages} ({total} eventos)</p>",
+        unsafe_allow_html=True,
+    )
+    if col_next.button(
+        'Próxima ➡️', disabled=page + 1 >= total_pages, width='stretch'
+    ):
+        st.session_state.audit_page = page + 1
+        st.rerun()
+
+
 def main():
     st.set_page_config(
         page_title='Admin | Verificalp',
@@ -559,12 +830,13 @@ def main():
         except Exception:
             pass
 
-    bootstrap_initial_user(db, bootstrap_data)
+    if not st.session_state.get('logged_in', False):
+        bootstrap_initial_user(db, bootstrap_data)
 
     if not login_form(db):
         st.stop()
 
-    config = get_configuracoes(db)
+    repo = Repository(db)
     user_role = st.session_state.get('role')
 
     with st.sidebar:
@@ -572,6 +844,7 @@ def main():
         st.sidebar.write(f"Usuário: **{st.session_state.get('username')}**")
         st.sidebar.write(f'Nível: **{user_role}**')
         if st.sidebar.button('Logout', width='stretch'):
+            cancel_prefetch()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -579,8 +852,10 @@ def main():
         menu_options = ['Inscrições', 'Turmas']
         menu_icons = ['person-lines-fill', 'collection']
         if user_role in ['admin-dev', 'admin']:
-            menu_options.extend(['Usuários', 'Configurações'])
-            menu_icons.extend(['people-fill', 'gear'])
+            menu_options.extend(['Usuários', 'Configurações', 'Auditoria'])
+            menu_icons.extend(['people-fill', 'gear', 'journal-text'])
+
+        from streamlit_option_menu import option_menu
 
         selected = option_menu(
             menu_title='Painel de Controle',
@@ -590,13 +865,30 @@ def main():
         )
 
     if selected == 'Inscrições':
-        display_enrollment_management(db, config)
+        repo.prefetch(
+            ('get_configuracoes',), ('get_unique_enrollment_semesters',)
+        )
+    elif selected == 'Turmas':
+        repo.prefetch(('get_configuracoes',), ('get_all_turmas',))
+    config = repo.get_configuracoes()
+
+    if selected == 'Inscrições':
+        display_enrollment_management(repo, config)
+        schedule_enrollment_prefetch(repo, config)
     elif selected == 'Turmas':
-        display_turma_management(db, config)
+        display_turma_management(repo, config)
     elif selected == 'Usuários' and user_role in ['admin-dev', 'admin']:
-        display_user_management(db)
+        display_user_management(repo)
     elif selected == 'Configurações' and user_role in ['admin-dev', 'admin']:
         display_settings_management(db, config)
+    elif selected == 'Auditoria' and user_role in ['admin-dev', 'admin']:
+        display_audit_log(repo)
+
+    if user_role == 'admin-dev':
+        st.sidebar.caption(
+            f'Consultas nesta execução: {repo.total_queries} '
+            f'({dict(repo.query_counts)})'
+        )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,185 @@
+"""
+Linha de comando do painel administrativo.
+
+Executa exportações e manutenções em lote sem passar pela interface Streamlit.
+Uso: python cli.py <comando> [opções] (veja python cli.py --help).
+"""
+import argparse
+import csv
+import getpass
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from core.crud import (create_user, get_configuracoes,
+                       get_enrollment_fields, get_unique_enrollment_semesters,
+                       iter_enrollments_by_semester,
+                       set_enrollments_deleted_by_matricula)
+from core.database import create_client, ensure_indexes, get_db_name
+from core.frames import build_export_frame
+from core.snapshots import rebuild_snapshot
+
+ROLES = ['auxiliar', 'admin', 'admin-dev']
+CLI_ACTOR = f'cli:{getpass.getuser()}'
+
+
+def get_db():
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        sys.exit('A variável de ambiente MONGO_URI não foi definida.')
+    return create_client(mongo_uri)[get_db_name()]
+
+
+def _export_rows(df):
+    """Converte um lote em linhas prontas para escrita (NaN vira None, objetos viram texto)."""
+    data = df.astype(object)
+    data = data.where(data.notna(), None)
+    return (
+        tuple(
+            v if v is None or isinstance(v, (str, int, float, bool)) else str(v)
+            for v in row
+        )
+        for row in data.itertuples(index=False, name=None)
+    )
+
+
+def cmd_export(db, args):
+    output = args.output or f'inscricoes_{args.semester}.{args.format}'
+    # Documentos completos, como na exportação do painel; as colunas são
+    # fixadas antes do streaming para que todos os lotes tenham o mesmo cabeçalho.
+    columns = get_enrollment_fields(db, args.semester, args.deleted)
+    columns.append('nota_classificacao')
+    batches = iter_enrollments_by_semester(
+        db,
+        args.semester,
+        deleted=args.deleted,
+        batch_size=args.batch_size,
+    )
+    total = 0
+
+    if args.format == 'csv':
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for batch in batches:
+                df = build_export_frame(batch).reindex(columns=columns)
+                writer.writerows(_export_rows(df))
+                total += len(df)
+    else:
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Inscricoes')
+        ws.append(columns)
+        for batch in batches:
+            df = build_export_frame(batch).reindex(columns=columns)
+            for row in _export_rows(df):
+                ws.append(row)
+            total += len(df)
+        wb.save(output)
+
+    print(f'{total} inscrições exportadas para {output}.')
+
+
+def _read_matriculas(args):
+    matriculas = list(args.matriculas)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            matriculas.extend(line.strip() for line in f)
+    return sorted({m for m in matriculas if m})
+
+
+def cmd_set_deleted(db, args, is_deleted):
+    matriculas = _read_matriculas(args)
+    if not matriculas:
+        sys.exit('Nenhuma matrícula informada.')
+    modified = set_enrollments_deleted_by_matricula(
+        db,
+        args.semester,
+        matriculas,
+        is_deleted,
+        batch_size=args.batch_size,
+        actor=CLI_ACTOR,
+    )
+    action = 'excluídas' if is_deleted else 'restauradas'
+    print(f'{modified} inscrições {action} em {args.semester}.')
+
+
+def cmd_rebuild(db, args):
+    ensure_indexes(db)
+    print('Índices verificados.')
+
+    active_semester = get_configuracoes(db).get('activeSemester')
+    for semester in get_unique_enrollment_semesters(db):
+        if semester == active_semester:
+            continue
+        for deleted in (False, True):
+            df = rebuild_snapshot(db, semester, deleted)
+            status = 'excluídas' if deleted else 'ativas'
+            print(f'Snapshot {semester} ({status}): {len(df)} inscrições.')
+
+
+def cmd_create_user(db, args):
+    username = args.username.lower()
+    password = args.password or getpass.getpass('Senha: ')
+    if not args.password and password != getpass.getpass('Confirmar Senha: '):
+        sys.exit('As senhas não coincidem.')
+    try:
+        create_user(
+            db,
+            {'username': username, 'password': password, 'role': args.role},
+            actor=CLI_ACTOR,
+        )
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Usuário '{username}' criado com sucesso!")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Painel de Administração (CLI)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='Exporta as inscrições de um semestre')
+    export.add_argument('semester')
+    export.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    export.add_argument('--output', '-o')
+    export.add_argument('--deleted', action='store_true', help='Exporta as excluídas')
+    export.add_argument('--batch-size', type=int, default=1000)
+    export.set_defaults(func=cmd_export)
+
+    for name, is_deleted, help_text in [
+        ('delete', True, 'Exclui (soft delete) inscrições por matrícula'),
+        ('restore', False, 'Restaura inscrições por matrícula'),
+    ]:
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument('semester')
+        cmd.add_argument('matriculas', nargs='*')
+        cmd.add_argument('--file', '-f', help='Arquivo com uma matrícula por linha')
+        cmd.add_argument('--batch-size', type=int, default=500)
+        cmd.set_defaults(
+            func=lambda db, args, d=is_deleted: cmd_set_deleted(db, args, d)
+        )
+
+    rebuild = sub.add_parser(
+        'rebuild', help='Recria índices e snapshots dos semestres encerrados'
+    )
+    rebuild.set_defaults(func=cmd_rebuild)
+
+    user = sub.add_parser('create-user', help='Cria um usuário')
+    user.add_argument('username')
+    user.add_argument('--role', choices=ROLES, default='auxiliar')
+    user.add_argument('--password', help='Se omitida, será solicitada')
+    user.set_defaults(func=cmd_create_user)
+
+    return parser
+
+
+def main(argv=None):
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    args.func(get_db(), args)
+
+
+if __name__ == '__main__':
+    main()
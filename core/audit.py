@@ -0,0 +1,189 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from bson import json_util
+from pymongo import DESCENDING
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, PyMongoError
+
+FLUSH_INTERVAL = 2.0
+MAX_BATCH = 500
+MAX_RETRIES = 5
+MAX_BACKOFF = 60.0
+DUPLICATE_KEY_ERROR = 11000
+# Eventos que o banco recusa (ou que esgotam as tentativas) vão para este arquivo.
+AUDIT_FALLBACK_PATH = os.getenv('AUDIT_FALLBACK_PATH', '.audit_fallback.jsonl')
+SENSITIVE_FIELDS = {'password', 'hashed_password'}
+
+
+class AuditLogger:
+    """
+    Enfileira eventos de auditoria em memória e os grava em lote na coleção
+    `audit` a partir de uma thread em segundo plano, sem bloquear a requisição.
+    """
+
+    def __init__(self, db: Database):
+        self._collection = db['audit']
+        self._queue: queue.Queue = queue.Queue()
+        self._retry: List[Dict[str, Any]] = []
+        self._attempts = 0
+        self._retry_at = 0.0
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name='audit-logger', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self._flush_at_exit)
+
+    def log(self, event: Dict[str, Any]):
+        self._queue.put(event)
+
+    def flush(self):
+        """Grava os eventos pendentes (respeitando o backoff após falhas)."""
+        with self._write_lock:
+            if time.monotonic() < self._retry_at:
+                return
+            events, self._retry = self._retry, []
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for start in range(0, len(events), MAX_BATCH):
+                if not self._write(events[start:start + MAX_BATCH]):
+                    self._retry.extend(events[start + MAX_BATCH:])
+                    break
+
+    def _write(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Grava um lote. Em falha transitória, devolve o lote para nova tentativa
+        com backoff exponencial; eventos recusados pelo banco vão para o arquivo local.
+        """
+        try:
+            self._collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            rejected = [
+                events[error['index']]
+                for error in e.details.get('writeErrors', [])
+                if error.get('code') != DUPLICATE_KEY_ERROR
+            ]
+            self._write_fallback(rejected, e)
+        except PyMongoError as e:
+            self._attempts += 1
+            if self._attempts > MAX_RETRIES:
+                self._write_fallback(events, e)
+            else:
+                self._retry = events + self._retry
+                self._retry_at = time.monotonic() + min(
+                    FLUSH_INTERVAL * 2 ** self._attempts, MAX_BACKOFF
+                )
+                return False
+        self._attempts = 0
+        self._retry_at = 0.0
+        return True
+
+    def _write_fallback(self, events: List[Dict[str, Any]], error: Exception):
+        if not events:
+            return
+        print(
+            f'Erro ao gravar {len(events)} eventos de auditoria ({error}); '
+            f'salvos em {AUDIT_FALLBACK_PATH}.'
+        )
+        try:
+            with open(AUDIT_FALLBACK_PATH, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json_util.dumps(event) + '\n')
+        except OSError as e:
+            print(f'Erro ao salvar eventos de auditoria localmente: {e}')
+
+    def _flush_at_exit(self):
+        # Na saída não há próxima tentativa: o que restar vai para o arquivo local.
+        self._retry_at = 0.0
+        self._attempts = MAX_RETRIES
+        self.flush()
+        with self._write_lock:
+            self._write_fallback(self._retry, RuntimeError('encerramento'))
+            self._retry = []
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+
+_loggers: Dict[Tuple[int, str], AuditLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_audit_logger(db: Database) -> AuditLogger:
+    """Retorna o logger de auditoria do processo para a database informada."""
+    key = id(db.client), db.name
+    with _loggers_lock:
+        logger = _loggers.get(key)
+        if logger is None:
+            logger = _loggers[key] = AuditLogger(db)
+        return logger
+
+
+def _sanitize(details: Dict[str, Any] | None) -> Dict[str, Any]:
+    if not details:
+        return {}
+    return {k: v for k, v in details.items() if k not in SENSITIVE_FIELDS}
+
+
+def log_event(
+    db: Database,
+    action: str,
+    actor: str | None,
+    target_id: Any = None,
+    details: Dict[str, Any] | None = None,
+):
+    """Registra uma ação administrativa (sem senhas, com o usuário em minúsculas) para gravação assíncrona."""
+    get_audit_logger(db).log(
+        {
+            'timestamp': datetime.now(timezone.utc),
+            'actor': (actor or 'desconhecido').strip().lower(),
+            'action': action,
+            'target_id': target_id,
+            'details': _sanitize(details),
+        }
+    )
+
+
+def ensure_audit_indexes(db: Database):
+    db['audit'].create_index([('timestamp', DESCENDING)])
+    db['audit'].create_index([('action', 1), ('timestamp', DESCENDING)])
+    db['audit'].create_index([('actor', 1), ('timestamp', DESCENDING)])
+
+
+def get_audit_actions(db: Database) -> List[str]:
+    return sorted(a for a in db['audit'].distinct('action') if a)
+
+
+def get_audit_page(
+    db: Database,
+    page: int = 0,
+    page_size: int = 50,
+    action: str | None = None,
+    actor: str | None = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Retorna uma página de eventos (mais recentes primeiro) e o total filtrado."""
+    query = {}
+    if action:
+        query['action'] = action
+    if actor:
+        query['actor'] = actor
+    total = db['audit'].count_documents(query)
+    events = list(
+        db['audit']
+        .find(query, {'_id': 0})
+        .sort('timestamp', DESCENDING)
+        .skip(page * page_size)
+        .limit(page_size)
+    )
+    return events, total
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict
+
+from pymongo.database import Database
+
+from core.crud import (BCRYPT_ROUNDS, check_password, find_user_by_username,
+                       hash_password)
+
+LOGIN_WORKERS = int(os.getenv('LOGIN_WORKERS', '4'))
+MAX_FAILED_ATTEMPTS = 5
+THROTTLE_WINDOW = 300
+THROTTLE_BASE_DELAY = 2
+THROTTLE_MAX_DELAY = 300
+MAX_TRACKED_USERNAMES = 10000
+
+# bcrypt libera o GIL; um pool limitado evita que uma rajada de logins
+# consuma toda a CPU do processo.
+_executor = ThreadPoolExecutor(
+    max_workers=LOGIN_WORKERS, thread_name_prefix='bcrypt'
+)
+# Ordenado pela última falha: entradas expiradas ficam sempre no início.
+_failures: OrderedDict = OrderedDict()
+_failures_lock = threading.Lock()
+
+
+def get_hash_rounds(hashed_password: bytes) -> int | None:
+    """Extrai o custo de um hash bcrypt ($2b$<custo>$...)."""
+    try:
+        return int(hashed_password.split(b'$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: bytes) -> bool:
+    return get_hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> bytes:
+    return hash_password(os.urandom(16).hex())
+
+
+def _retry_after(username: str) -> float:
+    """Segundos restantes de bloqueio para o usuário (0 se liberado)."""
+    now = time.monotonic()
+    with _failures_lock:
+        attempts = [
+            t for t in _failures.get(username, []) if now - t < THROTTLE_WINDOW
+        ]
+        if attempts:
+            _failures[username] = attempts
+        else:
+            _failures.pop(username, None)
+    excess = len(attempts) - MAX_FAILED_ATTEMPTS
+    if excess < 0:
+        return 0
+    delay = min(THROTTLE_BASE_DELAY * 2 ** excess, THROTTLE_MAX_DELAY)
+    return max(0.0, attempts[-1] + delay - now)
+
+
+def _register_failure(username: str):
+    now = time.monotonic()
+    with _failures_lock:
+        _failures.setdefault(username, []).append(now)
+        _failures.move_to_end(username)
+        # Remove usuários sem falhas recentes e limita o total rastreado,
+        # para que nomes inventados não façam o dicionário crescer sem limite.
+        while _failures:
+            oldest, attempts = next(iter(_failures.items()))
+            if (
+                now - attempts[-1] < THROTTLE_WINDOW
+                and len(_failures) <= MAX_TRACKED_USERNAMES
+            ):
+                break
+            del _failures[oldest]
+
+
+def _rehash(db: Database, user: Dict[str, Any], password: str):
+    try:
+        db['users'].update_one(
+            {'_id': user['_id'], 'hashed_password': user['hashed_password']},
+            {'$set': {'hashed_password': hash_password(password)}},
+        )
+    except Exception as e:
+        print(f"Erro ao atualizar o hash de '{user.get('username')}': {e}")
+
+
+def authenticate(
+    db: Database, username: str, password: str
+) -> Dict[str, Any] | None:
+    """
+    Valida as credenciais em um pool de threads limitado.
+    Hashes com custo diferente do configurado são refeitos após um login válido.
+    Levanta ValueError se o usuário estiver temporariamente bloqueado.
+    """
+    wait = _retry_after(username)
+    if wait:
+        raise ValueError(
+            f'Muitas tentativas de login. Tente novamente em {int(wait) + 1} s.'
+        )
+
+    user = find_user_by_username(db, username)
+    # Sem usuário, verifica um hash descartável para não revelar sua existência pelo tempo.
+    hashed_password = user['hashed_password'] if user else _dummy_hash()
+    valid = _executor.submit(check_password, password, hashed_password).result()
+
+    if not (user and valid):
+        _register_failure(username)
+        return None
+
+    with _failures_lock:
+        _failures.pop(username, None)
+    if needs_rehash(user['hashed_password']):
+        _executor.submit(_rehash, db, user, password)
+    return user
@@ -1,13 +1,25 @@
-from typing import Any, Dict, List
+import os
+import re
+from typing import Any, Dict, Iterator, List, Tuple
 
 import bcrypt
 from bson import ObjectId
 from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+
+from core.audit import log_event
+
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+DUPLICATE_USERNAME_MESSAGE = 'O nome de usuário já está em uso.'
+
+_unique_username_dbs = set()
 
 
 def hash_password(password: str) -> bytes:
-    """Gera o hash de uma senha."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    """Gera o hash de uma senha com o custo configurado em BCRYPT_ROUNDS."""
+    return bcrypt.hashpw(
+        password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    )
 
 
 def check_password(password: str, hashed_password: bytes) -> bool:
@@ -15,6 +27,11 @@ def check_password(password: str, hashed_password: bytes) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
 
 
+def normalize_username(username: str | None) -> str | None:
+    """Usernames são gravados em minúsculas, como o login os compara."""
+    return username.strip().lower() if username else username
+
+
 def find_user_by_username(
     db: Database, username: str
 ) -> Dict[str, Any] | None:
@@ -22,20 +39,52 @@ def find_user_by_username(
     return db['users'].find_one({'username': username})
 
 
+def has_unique_username_index(db: Database) -> bool:
+    """
+    Indica se `users.username` já tem índice único. O resultado positivo é
+    memorizado; enquanto for negativo, cada escrita consulta o índice de novo.
+    """
+    key = id(db.client), db.name
+    if key in _unique_username_dbs:
+        return True
+    for index in db['users'].index_information().values():
+        if index.get('unique') and index.get('key') == [('username', 1)]:
+            _unique_username_dbs.add(key)
+            return True
+    return False
+
+
+def _check_username_available(
+    db: Database, username: str, user_id: ObjectId | None = None
+):
+    """Checagem prévia usada apenas enquanto o índice único não existe."""
+    if has_unique_username_index(db):
+        return
+    existing_user = find_user_by_username(db, username)
+    if existing_user and existing_user['_id'] != user_id:
+        raise ValueError(DUPLICATE_USERNAME_MESSAGE)
+
+
 def bootstrap_initial_user(db: Database, user_data: Dict[str, str]):
     """Cria o usuário inicial se ele não existir no banco."""
-    username = user_data.get('username')
+    username = normalize_username(user_data.get('username'))
     if username and not find_user_by_username(db, username):
         password = user_data.get('password')
         hashed_pw = hash_password(password)
-        db['users'].insert_one(
+        # Upsert: duas renderizações simultâneas não criam nem falham em duplicidade.
+        result = db['users'].update_one(
+            {'username': username},
             {
-                'username': username,
-                'hashed_password': hashed_pw,
-                'role': 'admin-dev',
-            }
+                '$setOnInsert': {
+                    'username': username,
+                    'hashed_password': hashed_pw,
+                    'role': 'admin-dev',
+                }
+            },
+            upsert=True,
         )
-        print(f"Usuário inicial '{username}' criado com sucesso.")
+        if result.upserted_id is not None:
+            print(f"Usuário inicial '{username}' criado com sucesso.")
 
 
 def get_all_users(db: Database, admin_dev=False) -> List[Dict[str, Any]]:
@@ -45,52 +94,168 @@ def get_all_users(db: Database, admin_dev=False) -> List[Dict[str, Any]]:
     return list(db['users'].find(query, projection))
 
 
-def create_user(db: Database, user_data: Dict[str, Any]):
+def get_users_page(
+    db: Database,
+    admin_dev: bool = False,
+    search: str = '',
+    page: int = 0,
+    page_size: int = 20,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Retorna uma página de usuários (sem senhas) ordenada por nome e o total filtrado.
+    A busca é por prefixo do nome, para aproveitar o índice de `username`.
+    """
+    query: Dict[str, Any] = {} if admin_dev else {'role': {'$ne': 'admin-dev'}}
+    search = search.strip().lower()
+    if search:
+        query['username'] = {'$regex': f'^{re.escape(search)}'}
+    total = db['users'].count_documents(query)
+    users = list(
+        db['users']
+        .find(query, {'hashed_password': 0})
+        .sort('username', 1)
+        .skip(page * page_size)
+        .limit(page_size)
+    )
+    return users, total
+
+
+def create_user(
+    db: Database, user_data: Dict[str, Any], actor: str | None = None
+):
     """Cria um novo usuário com senha hasheada."""
+    user_data['username'] = normalize_username(user_data.get('username'))
+    _check_username_available(db, user_data['username'])
     password = user_data.pop('password')
     user_data['hashed_password'] = hash_password(password)
-    return db['users'].insert_one(user_data)
-
-
-def update_user(db: Database, user_id: ObjectId, update_data: Dict[str, Any]):
+    try:
+        result = db['users'].insert_one(user_data)
+    except DuplicateKeyError:
+        raise ValueError(DUPLICATE_USERNAME_MESSAGE)
+    log_event(db, 'create_user', actor, result.inserted_id, user_data)
+    return result
+
+
+def update_user(
+    db: Database,
+    user_id: ObjectId,
+    update_data: Dict[str, Any],
+    actor: str | None = None,
+):
     """Atualiza dados de um usuário. Se a senha for fornecida, faz o hash."""
     if 'username' in update_data:
-        existing_user = find_user_by_username(db, update_data['username'])
-        if existing_user and existing_user['_id'] != user_id:
-            raise ValueError('O nome de usuário já está em uso.')
+        update_data['username'] = normalize_username(update_data['username'])
+        _check_username_available(db, update_data['username'], user_id)
 
     if 'password' in update_data:
         password = update_data.pop('password')
         if password:
             update_data['hashed_password'] = hash_password(password)
 
-    return db['users'].update_one({'_id': user_id}, {'$set': update_data})
+    try:
+        result = db['users'].update_one(
+            {'_id': user_id}, {'$set': update_data}
+        )
+    except DuplicateKeyError:
+        raise ValueError(DUPLICATE_USERNAME_MESSAGE)
+    log_event(db, 'update_user', actor, user_id, update_data)
+    return result
 
 
-def delete_user(db: Database, user_id: ObjectId):
+def delete_user(db: Database, user_id: ObjectId, actor: str | None = None):
     """Deleta um usuário."""
-    return db['users'].delete_one({'_id': user_id})
+    result = db['users'].delete_one({'_id': user_id})
+    log_event(db, 'delete_user', actor, user_id)
+    return result
 
 def get_all_enrollments_by_semester(
-    db: Database, semester: str
+    db: Database, semester: str, projection: Dict[str, Any] | None = None
 ) -> List[Dict[str, Any]]:
     if not semester or semester == 'N/A':
         return []
     return list(db['inscricoes'].find(
-        {'semester': semester, 'is_deleted': False}
+        {'semester': semester, 'is_deleted': False}, projection
     ))
 
 
-def delete_enrollment(db: Database, enrollment_id: ObjectId):
-    """Realiza um Soft Delete (marca como excluído)."""
-    return (
-        db['inscricoes']
-        .update_one(
-            {'_id': enrollment_id},
-            {'$set': {'is_deleted': True}}
-        )
-        .modified_count
+def iter_enrollments_by_semester(
+    db: Database,
+    semester: str,
+    deleted: bool = False,
+    projection: Dict[str, Any] | None = None,
+    batch_size: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Percorre as inscrições do semestre em lotes, consumindo o cursor aos poucos."""
+    cursor = db['inscricoes'].find(
+        {'semester': semester, 'is_deleted': deleted},
+        projection,
+        batch_size=batch_size,
+    )
+    batch = []
+    for enrollment in cursor:
+        batch.append(enrollment)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_enrollment_fields(
+    db: Database, semester: str, deleted: bool = False
+) -> List[str]:
+    """Retorna os campos de primeiro nível presentes nas inscrições do semestre."""
+    pipeline = [
+        {'$match': {'semester': semester, 'is_deleted': deleted}},
+        {'$project': {'fields': {'$objectToArray': '$$ROOT'}}},
+        {'$unwind': '$fields'},
+        {'$group': {'_id': '$fields.k'}},
+    ]
+    fields = [doc['_id'] for doc in db['inscricoes'].aggregate(pipeline)]
+    return ['_id'] + sorted(f for f in fields if f != '_id')
+
+
+def get_semester_version(db: Database, semester: str) -> int:
+    """Retorna a versão das inscrições do semestre (alterada a cada exclusão/restauração)."""
+    doc = db['semester_versions'].find_one({'semester': semester}, {'version': 1})
+    return doc.get('version', 0) if doc else 0
+
+
+def bump_semester_version(db: Database, semester: str):
+    """Incrementa a versão do semestre, invalidando seus snapshots."""
+    if not semester:
+        return
+    db['semester_versions'].update_one(
+        {'semester': semester}, {'$inc': {'version': 1}}, upsert=True
+    )
+
+
+def _set_enrollment_deleted(
+    db: Database, enrollment_id: ObjectId, is_deleted: bool, actor: str | None
+) -> int:
+    enrollment = db['inscricoes'].find_one_and_update(
+        {'_id': enrollment_id, 'is_deleted': {'$ne': is_deleted}},
+        {'$set': {'is_deleted': is_deleted}},
+        projection={'semester': 1},
     )
+    if not enrollment:
+        return 0
+    bump_semester_version(db, enrollment.get('semester'))
+    log_event(
+        db,
+        'delete_enrollment' if is_deleted else 'recover_enrollment',
+        actor,
+        enrollment_id,
+        {'semester': enrollment.get('semester')},
+    )
+    return 1
+
+
+def delete_enrollment(
+    db: Database, enrollment_id: ObjectId, actor: str | None = None
+):
+    """Realiza um Soft Delete (marca como excluído)."""
+    return _set_enrollment_deleted(db, enrollment_id, True, actor)
 
 
 def get_unique_enrollment_semesters(db: Database) -> List[str]:
@@ -101,7 +266,7 @@ def get_unique_enrollment_semesters(db: Database) -> List[str]:
 
 
 def get_deleted_enrollments_by_semester(
-    db: Database, semester: str
+    db: Database, semester: str, projection: Dict[str, Any] | None = None
 ) -> List[Dict[str, Any]]:
     """Retorna apenas as inscrições marcadas como deletadas do semestre."""
     if not semester or semester == 'N/A':
@@ -109,15 +274,88 @@ def get_deleted_enrollments_by_semester(
     return list(db['inscricoes'].find({
         'semester': semester,
         'is_deleted': True
-    }))
+    }, projection))
 
 
-def recover_enrollment(db: Database, enrollment_id: ObjectId):
+def recover_enrollment(
+    db: Database, enrollment_id: ObjectId, actor: str | None = None
+):
     """Restaura uma inscrição deletada."""
-    return db['inscricoes'].update_one(
-        {'_id': enrollment_id},
-        {'$set': {'is_deleted': False}}
-    ).modified_count
+    return _set_enrollment_deleted(db, enrollment_id, False, actor)
+
+
+def _bulk_set_enrollments_deleted(
+    db: Database,
+    semester: str,
+    field: str,
+    values: List[Any],
+    is_deleted: bool,
+    batch_size: int,
+    actor: str | None,
+) -> int:
+    modified = 0
+    for start in range(0, len(values), batch_size):
+        chunk = values[start:start + batch_size]
+        chunk_modified = db['inscricoes'].update_many(
+            {
+                'semester': semester,
+                field: {'$in': chunk},
+                'is_deleted': {'$ne': is_deleted},
+            },
+            {'$set': {'is_deleted': is_deleted}},
+        ).modified_count
+        # Um evento por lote: operações grandes não geram um documento gigante.
+        if chunk_modified:
+            log_event(
+                db,
+                'delete_enrollment' if is_deleted else 'recover_enrollment',
+                actor,
+                details={
+                    'semester': semester,
+                    field: chunk,
+                    'modified': chunk_modified,
+                },
+            )
+        modified += chunk_modified
+    if modified:
+        bump_semester_version(db, semester)
+    return modified
+
+
+def set_enrollments_deleted_by_matricula(
+    db: Database,
+    semester: str,
+    matriculas: List[str],
+    is_deleted: bool,
+    batch_size: int = 500,
+    actor: str | None = None,
+) -> int:
+    """
+    Exclui ou restaura, em lotes, as inscrições do semestre com as matrículas informadas.
+    `Matricula` pode estar gravada como int ou str no banco e o `$in` diferencia
+    tipos, então matrículas numéricas também são buscadas como int.
+    """
+    values = []
+    for matricula in matriculas:
+        values.append(matricula)
+        if matricula.isdigit() and str(int(matricula)) == matricula:
+            values.append(int(matricula))
+    return _bulk_set_enrollments_deleted(
+        db, semester, 'Matricula', values, is_deleted, batch_size, actor
+    )
+
+
+def delete_enrollments(
+    db: Database,
+    semester: str,
+    enrollment_ids: List[ObjectId],
+    batch_size: int = 500,
+    actor: str | None = None,
+) -> int:
+    """Realiza o Soft Delete, em lotes, das inscrições informadas do semestre."""
+    return _bulk_set_enrollments_deleted(
+        db, semester, '_id', enrollment_ids, True, batch_size, actor
+    )
 
 
 def get_all_turmas(db: Database) -> List[Dict[str, Any]]:
@@ -128,20 +366,33 @@ def get_unique_semesters(db: Database) -> List[str]:
     return db['turma'].distinct('semester')
 
 
-def add_turma(db: Database, turma_data: Dict[str, Any]):
-    return db['turma'].insert_one(turma_data)
+def add_turma(
+    db: Database, turma_data: Dict[str, Any], actor: str | None = None
+):
+    result = db['turma'].insert_one(turma_data)
+    log_event(db, 'add_turma', actor, result.inserted_id, turma_data)
+    return result
 
 
-def update_turma(db: Database, turma_id: ObjectId, turma_data: Dict[str, Any]):
-    return (
+def update_turma(
+    db: Database,
+    turma_id: ObjectId,
+    turma_data: Dict[str, Any],
+    actor: str | None = None,
+):
+    modified = (
         db['turma']
         .update_one({'_id': turma_id}, {'$set': turma_data})
         .modified_count
     )
+    log_event(db, 'update_turma', actor, turma_id, turma_data)
+    return modified
 
 
-def delete_turma(db: Database, turma_id: ObjectId):
-    return db['turma'].delete_one({'_id': turma_id}).deleted_count
+def delete_turma(db: Database, turma_id: ObjectId, actor: str | None = None):
+    deleted = db['turma'].delete_one({'_id': turma_id}).deleted_count
+    log_event(db, 'delete_turma', actor, turma_id)
+    return deleted
 
 
 def get_configuracoes(db: Database) -> Dict[str, Any]:
@@ -149,10 +400,14 @@ def get_configuracoes(db: Database) -> Dict[str, Any]:
     return config if config else {}
 
 
-def update_configuracoes(db: Database, new_config: Dict[str, Any]):
-    return (
+def update_configuracoes(
+    db: Database, new_config: Dict[str, Any], actor: str | None = None
+):
+    acknowledged = (
         db['config']
         .update_one({}, {'$set': new_config}, upsert=True)
         .acknowledged
     )
+    log_event(db, 'update_configuracoes', actor, details=new_config)
+    return acknowledged
 
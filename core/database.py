@@ -4,6 +4,19 @@ import streamlit as st
 from pymongo import MongoClient
 from pymongo.database import Database
 
+from core.audit import ensure_audit_indexes
+
+
+def create_client(mongo_uri: str) -> MongoClient:
+    """Cria um cliente MongoDB e valida a conexão com um ping."""
+    client = MongoClient(mongo_uri)
+    client.admin.command('ping')
+    return client
+
+
+def get_db_name() -> str:
+    return os.getenv('DB_NAME', 'DLPL')
+
 
 @st.cache_resource
 def get_db_connection() -> MongoClient:
@@ -16,9 +29,7 @@ def get_db_connection() -> MongoClient:
         if not mongo_uri:
             st.error('A variável de ambiente MONGO_URI não foi definida.')
             st.stop()
-        client = MongoClient(mongo_uri)
-
-        client.admin.command('ping')
+        client = create_client(mongo_uri)
         print('Conexão com o MongoDB estabelecida com sucesso.')
         return client
     except Exception as e:
@@ -32,6 +43,28 @@ def get_database(_client: MongoClient) -> Database | None:
     Retorna a database específica a partir de uma conexão ativa.
     """
     if _client:
-        db_name = os.getenv('DB_NAME', 'DLPL')
-        return _client[db_name]
+        db = _client[get_db_name()]
+        try:
+            ensure_indexes(db)
+        except Exception as e:
+            print(f'Erro ao criar índices: {e}')
+        return db
     return None
+
+
+def ensure_indexes(db: Database):
+    """Cria (ou confirma) os índices usados pelas consultas do painel."""
+    db['inscricoes'].create_index([('semester', 1), ('is_deleted', 1)])
+    db['inscricoes'].create_index([('semester', 1), ('Matricula', 1)])
+    db['turma'].create_index('semester')
+    db['semester_versions'].create_index('semester', unique=True)
+    ensure_audit_indexes(db)
+    # Por último: falha se já houver nomes duplicados, sem afetar os demais.
+    # Sem o índice, create_user/update_user mantêm a checagem prévia.
+    try:
+        db['users'].create_index('username', unique=True)
+    except Exception as e:
+        print(
+            'ATENÇÃO: não foi possível criar o índice único de users.username '
+            f'(há nomes duplicados?): {e}. A checagem prévia de nomes segue ativa.'
+        )
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import pandas as pd
+from pymongo.database import Database
+
+from core.crud import get_semester_version
+from core.frames import frame_memory_usage
+from core.snapshots import load_enrollment_frame
+
+FRAME_CACHE_BUDGET = int(os.getenv('FRAME_CACHE_MB', '256')) * 1024 ** 2
+# O semestre ativo recebe novas inscrições sem alterar a versão do semestre.
+ACTIVE_FRAME_TTL = int(os.getenv('ACTIVE_FRAME_TTL', '60'))
+
+# Um único worker: o prefetch nunca disputa mais de uma thread com as páginas.
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='prefetch'
+)
+
+
+class FrameCache:
+    """
+    Cache LRU de DataFrames de inscrições compartilhado pelo processo,
+    limitado por um orçamento de memória. Os DataFrames são somente leitura.
+    """
+
+    def __init__(self, budget_bytes: int = FRAME_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self._frames: OrderedDict = OrderedDict()
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used_bytes
+
+    def has_room(self) -> bool:
+        return self._used_bytes < self.budget_bytes
+
+    def _lookup(self, key: Hashable, ttl: int | None) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            df, _, loaded_at = entry
+            if ttl is not None and time.monotonic() - loaded_at > ttl:
+                self._evict(key)
+                return None
+            self._frames.move_to_end(key)
+            return df
+
+    def _evict(self, key: Hashable):
+        _, size, _ = self._frames.pop(key)
+        self._used_bytes -= size
+
+    def _store(self, key: Hashable, df: pd.DataFrame):
+        size = frame_memory_usage(df)
+        with self._lock:
+            # Versões anteriores do mesmo semestre/visão não serão mais lidas.
+            for old in [k for k in self._frames if k[:-1] == key[:-1]]:
+                self._evict(old)
+            if size > self.budget_bytes:
+                return
+            self._frames[key] = (df, size, time.monotonic())
+            self._used_bytes += size
+            while self._used_bytes > self.budget_bytes:
+                self._evict(next(iter(self._frames)))
+
+    def get_or_load(
+        self,
+        key: Tuple,
+        loader: Callable[[], pd.DataFrame],
+        ttl: int | None = None,
+    ) -> pd.DataFrame:
+        """Retorna o DataFrame em cache; cargas simultâneas da mesma chave são unificadas."""
+        df = self._lookup(key, ttl)
+        if df is not None:
+            return df
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            df = self._lookup(key, ttl)
+            if df is None:
+                df = loader()
+                self._store(key, df)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return df
+
+
+def get_enrollment_frame(
+    db: Database,
+    cache: FrameCache,
+    semester: str,
+    deleted: bool = False,
+    active_semester: str | None = None,
+    on_query: Callable[[str], None] | None = None,
+) -> pd.DataFrame:
+    """Retorna o DataFrame de inscrições do semestre passando pelo cache compartilhado."""
+    if not semester or semester == 'N/A':
+        return load_enrollment_frame(db, semester, deleted, active_semester)
+
+    if on_query:
+        on_query('get_semester_version')
+    version = get_semester_version(db, semester)
+    ttl = ACTIVE_FRAME_TTL if semester == active_semester else None
+    return cache.get_or_load(
+        (semester, deleted, version),
+        lambda: load_enrollment_frame(
+            db,
+            semester,
+            deleted,
+            active_semester,
+            version=version,
+            on_query=on_query,
+        ),
+        ttl,
+    )
+
+
+def _prefetch(
+    db: Database,
+    cache: FrameCache,
+    targets: List[Tuple[str, bool]],
+    active_semester: str | None,
+    cancel: threading.Event,
+    is_alive: Callable[[], bool],
+):
+    for semester, deleted in targets:
+        if cancel.is_set() or not is_alive() or not cache.has_room():
+            return
+        try:
+            get_enrollment_frame(db, cache, semester, deleted, active_semester)
+        except Exception as e:
+            print(f'Erro no prefetch de {semester}: {e}')
+
+
+def schedule_prefetch(
+    db: Database,
+    cache: FrameCache,
+    targets: List[Tuple[str, bool]],
+    active_semester: str | None,
+    is_alive: Callable[[], bool] = lambda: True,
+) -> threading.Event:
+    """
+    Aquece o cache em segundo plano com as visões informadas (semestre, excluídas).
+    Retorna um Event que, ao ser sinalizado, interrompe o prefetch pendente.
+    """
+    cancel = threading.Event()
+    _prefetch_executor.submit(
+        _prefetch, db, cache, targets, active_semester, cancel, is_alive
+    )
+    return cancel
@@ -0,0 +1,219 @@
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Campos efetivamente usados pelo painel; o restante do documento é descartado.
+ENROLLMENT_PROJECTION = {
+    '_id': 1,
+    'Nome': 1,
+    'Matricula': 1,
+    'email': 1,
+    'Curso': 1,
+    'turma_escolhida': 1,
+    'escolha': 1,
+    'semester': 1,
+    'notas_relevantes.nota_predita': 1,
+    'data_inscricao': 1,
+    'data_ultima_atualizacao': 1,
+}
+
+# `_id` fica como texto; só os ids efetivamente usados voltam a ser ObjectId.
+ENROLLMENT_SCHEMA = {
+    '_id': 'object',
+    'Nome': 'object',
+    'Matricula': 'object',
+    'email': 'object',
+    'Curso': 'category',
+    'turma_escolhida': 'category',
+    'escolha': 'category',
+    'semester': 'category',
+    'nota_classificacao': 'float32',
+    'data_inscricao': 'datetime64[ns]',
+    'data_ultima_atualizacao': 'datetime64[ns]',
+}
+
+SEARCH_COLUMNS = [
+    'Nome',
+    'Matricula',
+    'email',
+    'Curso',
+    'turma_escolhida',
+    'escolha',
+]
+
+TIMEZONE_ALVO = 'America/Recife'
+
+# Valores de preenchimento que não identificam um aluno (após normalização).
+PLACEHOLDER_KEYS = {'na', 'nan', 'nd', 'none', 'null', 'sn', 'sem', 'semmatricula'}
+# Uma chave compartilhada por mais inscrições que isso (ex.: email institucional
+# comum) não é tratada como o mesmo aluno.
+MAX_DUPLICATE_KEY_SHARE = int(os.getenv('MAX_DUPLICATE_KEY_SHARE', '5'))
+
+
+def _nota_predita(notas: Any) -> float:
+    if isinstance(notas, dict):
+        return notas.get('nota_predita', 0) or 0
+    return 0
+
+
+def _as_text(value: Any) -> str | None:
+    """Normaliza campos textuais: o banco pode ter valores int e str misturados."""
+    if value is None or value != value:
+        return None
+    return str(value)
+
+
+def _to_local_datetime(values: pd.Series) -> pd.Series:
+    """Converte datas ISO para o horário local (sem fuso), truncadas em segundos."""
+    # utc=True: datas sem fuso são UTC, mesmo misturadas a datas com fuso.
+    parsed = pd.to_datetime(values, format='ISO8601', errors='coerce', utc=True)
+    return parsed.dt.tz_convert(TIMEZONE_ALVO).dt.tz_localize(None).dt.floor('s')
+
+
+def build_enrollment_frame(enrollments: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame de inscrições com um esquema explícito.
+    Campos de baixa cardinalidade viram categorias e campos não usados são descartados.
+    """
+    columns = {}
+    for name, dtype in ENROLLMENT_SCHEMA.items():
+        if name == 'nota_classificacao':
+            values = [
+                _nota_predita(e.get('notas_relevantes')) for e in enrollments
+            ]
+            columns[name] = pd.Series(values, dtype='float32')
+        elif dtype.startswith('datetime'):
+            values = pd.Series([e.get(name) for e in enrollments], dtype='object')
+            columns[name] = _to_local_datetime(values)
+        else:
+            columns[name] = pd.Series(
+                [_as_text(e.get(name)) for e in enrollments], dtype=dtype
+            )
+    return pd.DataFrame(columns)
+
+
+def search_mask(df: pd.DataFrame, query: str) -> pd.Series:
+    """
+    Retorna uma máscara booleana das linhas que contêm o texto buscado.
+    Busca apenas nas colunas de SEARCH_COLUMNS (não em datas nem notas);
+    colunas categóricas são comparadas apenas nas categorias distintas.
+    """
+    query = query.lower()
+    mask = pd.Series(False, index=df.index)
+    for col in SEARCH_COLUMNS:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories.astype(str).str.lower()
+            hits = series.cat.categories[
+                categories.str.contains(query, regex=False)
+            ]
+            mask |= series.isin(hits)
+        else:
+            mask |= (
+                series.astype(str)
+                .str.lower()
+                .str.contains(query, regex=False, na=False)
+            )
+    return mask
+
+
+def build_export_frame(enrollments: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame de exportação com os documentos completos, como o
+    painel sempre exportou: todos os campos, a nota de classificação e as
+    datas formatadas no horário local.
+    """
+    df = pd.DataFrame(enrollments)
+    if df.empty:
+        return df
+    df['_id'] = df['_id'].astype(str)
+    df['nota_classificacao'] = [
+        _nota_predita(e.get('notas_relevantes')) for e in enrollments
+    ]
+    for col in ['data_inscricao', 'data_ultima_atualizacao']:
+        if col in df.columns:
+            df[col] = _to_local_datetime(df[col]).dt.strftime(
+                '%d/%m/%Y %H:%M:%S'
+            )
+    return df
+
+
+def frame_memory_usage(df: pd.DataFrame) -> int:
+    """Retorna o uso de memória do DataFrame em bytes (inclui objetos)."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _normalize_key(values: pd.Series, pattern: str) -> pd.Series:
+    key = (
+        values.astype('string')
+        .str.strip()
+        .str.lower()
+        .str.replace(pattern, '', regex=True)
+    )
+    return key.replace('', pd.NA)
+
+
+def _key_codes(key: pd.Series, placeholder: pd.Series) -> np.ndarray:
+    """Fatora as chaves, descartando (-1) placeholders e chaves compartilhadas demais."""
+    codes, _ = pd.factorize(key.mask(placeholder.fillna(False)))
+    # Posição extra no fim para o código -1 (sem chave), com contagem zero.
+    counts = np.bincount(codes + 1, minlength=1)[1:]
+    counts = np.append(counts, 0)
+    codes[counts[codes] > MAX_DUPLICATE_KEY_SHARE] = -1
+    return codes
+
+
+def find_duplicate_enrollments(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrupa inscrições que compartilham Matrícula ou email normalizados
+    (transitivamente) e retorna apenas os grupos com mais de uma inscrição.
+    Cada linha recebe o grupo (`grupo`) e se é a mais recente (`manter`).
+    Placeholders (ex.: 'N/A', '0', email sem '@') e chaves presentes em mais de
+    MAX_DUPLICATE_KEY_SHARE inscrições são ignorados, para não encadear alunos distintos.
+    """
+    matricula = _normalize_key(df['Matricula'], r'[^0-9a-z]')
+    email = _normalize_key(df['email'], r'\s')
+    codes = [
+        _key_codes(
+            matricula,
+            matricula.isin(PLACEHOLDER_KEYS) | matricula.str.fullmatch('0+'),
+        ),
+        _key_codes(
+            email,
+            ~email.str.contains('@', regex=False)
+            | email.str.split('@').str[0].isin(PLACEHOLDER_KEYS),
+        ),
+    ]
+    labels = np.arange(len(df))
+    # Propaga o menor rótulo entre inscrições ligadas por qualquer chave,
+    # com "pointer jumping", até estabilizar (componentes conexos).
+    while len(df):
+        previous = labels
+        for code in codes:
+            valid = code >= 0
+            # Uma posição extra para o código -1 (sem chave).
+            group_min = np.full(code.max() + 2, len(df))
+            np.minimum.at(group_min, code[valid], labels[valid])
+            labels = np.where(valid, group_min[code], labels)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            break
+    labels = pd.Series(labels, index=df.index)
+
+    sizes = labels.map(labels.value_counts())
+    duplicates = df[sizes > 1].assign(grupo=labels[sizes > 1])
+    if duplicates.empty:
+        return duplicates.assign(manter=pd.Series(dtype='bool'))
+
+    duplicates = duplicates.sort_values(
+        ['grupo', 'data_ultima_atualizacao'],
+        ascending=[True, False],
+        na_position='last',
+    )
+    duplicates['grupo'] = duplicates['grupo'].rank(method='dense').astype('int32')
+    duplicates['manter'] = duplicates.groupby('grupo').cumcount() == 0
+    return duplicates
@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from pymongo.database import Database
+
+from core import audit, crud
+
+# Pool compartilhado por todas as sessões do processo, usado apenas pelo prefetch;
+# leituras comuns rodam na própria thread do script. Fica abaixo do maxPoolSize
+# padrão do pymongo (100) para não disputar conexões com as leituras diretas.
+PREFETCH_WORKERS = int(os.getenv('REPO_PREFETCH_WORKERS', '32'))
+_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix='repo'
+)
+
+
+class Repository:
+    """
+    Camada de leitura com escopo de uma execução (rerun) do script.
+    Leituras repetidas reaproveitam o mesmo resultado (inclusive se ainda em
+    andamento) e leituras independentes podem ser disparadas em paralelo.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.query_counts: Counter = Counter()
+        self._memo: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def _submit(
+        self, name: str, func: Callable, *args, queries: int = 1
+    ) -> Future:
+        key = (name, *args)
+        with self._lock:
+            future = self._memo.get(key)
+            if future is None:
+                self.query_counts[name] += queries
+                future = self._memo[key] = _executor.submit(func, self.db, *args)
+        return future
+
+    def _call(
+        self, name: str, func: Callable, *args, queries: int = 1
+    ) -> Any:
+        """Lê na thread atual, reaproveitando o resultado de um prefetch se houver."""
+        key = (name, *args)
+        with self._lock:
+            future = self._memo.get(key)
+            if future is None:
+                self.query_counts[name] += queries
+                future = self._memo[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if owner:
+            try:
+                future.set_result(func(self.db, *args))
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _read(self, name: str, *args) -> Any:
+        return self._call(name, getattr(crud, name), *args)
+
+    def count_query(self, name: str, queries: int = 1):
+        """Contabiliza consultas feitas fora do repositório (ex.: dentro de caches)."""
+        with self._lock:
+            self.query_counts[name] += queries
+
+    def prefetch(self, *calls: Tuple):
+        """Dispara em paralelo leituras independentes, ex.: ('get_configuracoes',)."""
+        for name, *args in calls:
+            self._submit(name, getattr(crud, name), *args)
+
+    @property
+    def total_queries(self) -> int:
+        return sum(self.query_counts.values())
+
+    def get_configuracoes(self) -> Dict[str, Any]:
+        return self._read('get_configuracoes')
+
+    def get_unique_enrollment_semesters(self) -> List[str]:
+        # Cópia: a página de inscrições acrescenta o semestre ativo à lista.
+        return list(self._read('get_unique_enrollment_semesters'))
+
+    def get_all_turmas(self) -> List[Dict[str, Any]]:
+        return self._read('get_all_turmas')
+
+    def get_enrollment_frame(
+        self,
+        cache,
+        semester: str,
+        deleted: bool = False,
+        active_semester: str | None = None,
+    ):
+        """DataFrame de inscrições via cache compartilhado; só consultas reais são contadas."""
+        from core.frame_cache import get_enrollment_frame
+
+        return get_enrollment_frame(
+            self.db,
+            cache,
+            semester,
+            deleted,
+            active_semester,
+            on_query=self.count_query,
+        )
+
+    def get_audit_actions(self) -> List[str]:
+        return self._call('get_audit_actions', audit.get_audit_actions)
+
+    def get_audit_page(
+        self,
+        page: int = 0,
+        page_size: int = 50,
+        action: str | None = None,
+        actor: str | None = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # count_documents + find
+        return self._call(
+            'get_audit_page',
+            audit.get_audit_page,
+            page,
+            page_size,
+            action,
+            actor,
+            queries=2,
+        )
+
+    def get_unique_semesters(self) -> List[str]:
+        """Derivado de get_all_turmas, evitando uma segunda consulta a `turma`."""
+        semesters = {t.get('semester') for t in self.get_all_turmas()}
+        return [s for s in semesters if s]
@@ -0,0 +1,141 @@
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+from pymongo.database import Database
+
+from core.crud import (get_all_enrollments_by_semester,
+                       get_deleted_enrollments_by_semester,
+                       get_semester_version)
+from core.frames import ENROLLMENT_PROJECTION, build_enrollment_frame
+
+# pyarrow está em requirements.txt. O pickle é só um fallback para ambientes
+# sem ele: carrega o snapshot inteiro, sem memory-map, mas ainda evita a
+# consulta ao banco e a normalização.
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+SNAPSHOT_DIR = Path(os.getenv('SNAPSHOT_DIR', '.snapshots'))
+SNAPSHOT_EXT = '.feather' if feather is not None else '.pkl'
+
+
+def _snapshot_prefix(semester: str, deleted: bool) -> str:
+    status = 'excluidas' if deleted else 'ativas'
+    return f'inscricoes_{semester}_{status}_v'
+
+
+def _snapshot_path(semester: str, deleted: bool, version: int) -> Path:
+    return SNAPSHOT_DIR / f'{_snapshot_prefix(semester, deleted)}{version}{SNAPSHOT_EXT}'
+
+
+def read_snapshot(semester: str, deleted: bool, version: int) -> pd.DataFrame | None:
+    """
+    Lê o snapshot de um semestre encerrado, se existir para a versão informada.
+    O arquivo Feather é aberto via memory-map, mas `to_pandas` ainda copia as
+    colunas; o ganho é evitar a consulta e a normalização, não a cópia.
+    """
+    path = _snapshot_path(semester, deleted, version)
+    if not path.exists():
+        return None
+    try:
+        if feather is not None:
+            df = feather.read_table(path, memory_map=True).to_pandas()
+        else:
+            with open(path, 'rb') as f:
+                df = pickle.load(f)
+    except Exception as e:
+        print(f'Snapshot inválido em {path}: {e}')
+        return None
+    return df
+
+
+def write_snapshot(df: pd.DataFrame, semester: str, deleted: bool, version: int):
+    """Grava o snapshot de forma atômica e remove versões antigas do mesmo semestre."""
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    path = _snapshot_path(semester, deleted, version)
+    # Arquivo temporário exclusivo: outros processos podem gravar o mesmo snapshot.
+    fd, tmp_name = tempfile.mkstemp(
+        dir=SNAPSHOT_DIR, prefix=f'.{path.stem}.', suffix='.tmp'
+    )
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if feather is not None:
+                # Sem compressão para que a leitura possa ser feita via memory-map.
+                feather.write_feather(df, f, compression='uncompressed')
+            else:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    prefix = _snapshot_prefix(semester, deleted)
+    for old in SNAPSHOT_DIR.glob(f'{prefix}*{SNAPSHOT_EXT}'):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def fetch_enrollment_frame(
+    db: Database,
+    semester: str,
+    deleted: bool = False,
+    on_query: Callable[[str], None] | None = None,
+) -> pd.DataFrame:
+    """Busca as inscrições do semestre no banco e monta o DataFrame normalizado."""
+    if on_query and semester and semester != 'N/A':
+        on_query('find_enrollments')
+    if deleted:
+        enrollments = get_deleted_enrollments_by_semester(
+            db, semester, ENROLLMENT_PROJECTION
+        )
+    else:
+        enrollments = get_all_enrollments_by_semester(
+            db, semester, ENROLLMENT_PROJECTION
+        )
+    return build_enrollment_frame(enrollments)
+
+
+def load_enrollment_frame(
+    db: Database,
+    semester: str,
+    deleted: bool = False,
+    active_semester: str | None = None,
+    version: int | None = None,
+    on_query: Callable[[str], None] | None = None,
+) -> pd.DataFrame:
+    """
+    Retorna o DataFrame de inscrições do semestre.
+    Semestres encerrados são servidos do snapshot local, reconstruído apenas
+    quando a versão do semestre muda; o semestre ativo é sempre lido do banco.
+    `on_query` é chamado com o nome de cada consulta feita ao banco.
+    """
+    if not semester or semester == 'N/A' or semester == active_semester:
+        return fetch_enrollment_frame(db, semester, deleted, on_query)
+
+    if version is None:
+        if on_query:
+            on_query('get_semester_version')
+        version = get_semester_version(db, semester)
+    df = read_snapshot(semester, deleted, version)
+    if df is not None:
+        return df
+
+    df = fetch_enrollment_frame(db, semester, deleted, on_query)
+    try:
+        write_snapshot(df, semester, deleted, version)
+    except Exception as e:
+        print(f'Erro ao gravar snapshot de {semester}: {e}')
+    return df
+
+
+def rebuild_snapshot(db: Database, semester: str, deleted: bool = False) -> pd.DataFrame:
+    """Reconstrói o snapshot do semestre a partir do banco, ignorando o existente."""
+    df = fetch_enrollment_frame(db, semester, deleted)
+    write_snapshot(df, semester, deleted, get_semester_version(db, semester))
+    return df
@@ -1,11 +1,17 @@
 import base64
+import re
+from functools import lru_cache
 from pathlib import Path
 
 import streamlit as st
 
+ASSETS_DIR = Path(__file__).resolve().parent.parent
+LOGO_PATH = ASSETS_DIR / 'logo.png'
 
+
+@lru_cache(maxsize=None)
 def load_image_as_base64(image_path: str):
-    """Carrega uma imagem e a converte para base64."""
+    """Carrega uma imagem e a converte para base64 (uma vez por processo)."""
     try:
         with open(image_path, 'rb') as img_file:
             return base64.b64encode(img_file.read()).decode()
@@ -13,11 +19,14 @@ def load_image_as_base64(image_path: str):
         return None
 
 
-def load_css():
-    """Carrega um CSS customizado para a aplicação."""
-    st.markdown(
-        """
-        <style>
+def _minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{}:;,>])\s*', r'\1', css).strip()
+
+
+CUSTOM_CSS = _minify_css(
+    """
             /* Cor de fundo principal */
             .stApp {
                 background-color: #f5f5f5;
@@ -63,17 +72,26 @@ def load_css():
                 width: 240px;
                 margin-bottom: 25px;
             }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    """
+)
+CUSTOM_CSS_HTML = f'<style>{CUSTOM_CSS}</style>'
+
+
+def load_css():
+    """Carrega um CSS customizado para a aplicação."""
+    st.markdown(CUSTOM_CSS_HTML, unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=None)
+def _logo_html(class_name: str) -> str | None:
+    logo_base64 = load_image_as_base64(str(LOGO_PATH))
+    if not logo_base64:
+        return None
+    return f'<img src="data:image/png;base64,{logo_base64}" class="{class_name}">'
 
 
 def display_logo(container, class_name='sidebar-logo'):
     """Exibe a logo em um container específico com uma classe CSS."""
-    logo_base64 = load_image_as_base64('logo.png')
-    if logo_base64:
-        container.markdown(
-            f'<img src="data:image/png;base64,{logo_base64}" class="{class_name}">',
-            unsafe_allow_html=True,
-        )
+    logo_html = _logo_html(class_name)
+    if logo_html:
+        container.markdown(logo_html, unsafe_allow_html=True)